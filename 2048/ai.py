@@ -0,0 +1,245 @@
+"""
+Expectimax autoplayer working on packed boards (see bitboard.py).
+"""
+import argparse
+import time
+from collections import OrderedDict
+
+import bitboard
+from bitboard import ROW_MASK, get_empty_cells, move, transpose
+from logic import Direction, Engine2048
+
+# Heuristic weights
+LOST_PENALTY = 200000.0
+MONOTONICITY_POWER = 4.0
+MONOTONICITY_WEIGHT = 47.0
+SUM_POWER = 3.5
+SUM_WEIGHT = 11.0
+MERGES_WEIGHT = 700.0
+EMPTY_WEIGHT = 270.0
+
+# Chance nodes less probable than this are evaluated by the heuristic only
+MIN_PROBABILITY = 0.0001
+
+
+def _build_heuristic_table() -> list[float]:
+    table = [0.0] * 65536
+    for row in range(65536):
+        line = [(row >> (4 * index)) & 0xF for index in range(4)]
+        value_sum = sum(value ** SUM_POWER for value in line)
+        empty = line.count(0)
+
+        merges = 0
+        previous = 0
+        counter = 0
+        for value in line:
+            if value == 0:
+                continue
+            if value == previous:
+                counter += 1
+            elif counter > 0:
+                merges += 1 + counter
+                counter = 0
+            previous = value
+        if counter > 0:
+            merges += 1 + counter
+
+        monotonicity_left = 0.0
+        monotonicity_right = 0.0
+        for index in range(1, 4):
+            left = line[index - 1] ** MONOTONICITY_POWER
+            right = line[index] ** MONOTONICITY_POWER
+            if line[index - 1] > line[index]:
+                monotonicity_left += left - right
+            else:
+                monotonicity_right += right - left
+
+        table[row] = (
+            LOST_PENALTY
+            + EMPTY_WEIGHT * empty
+            + MERGES_WEIGHT * merges
+            - MONOTONICITY_WEIGHT * min(monotonicity_left, monotonicity_right)
+            - SUM_WEIGHT * value_sum
+        )
+    return table
+
+
+HEURISTIC_TABLE = _build_heuristic_table()
+
+
+def heuristic(board: int) -> float:
+    table = HEURISTIC_TABLE
+    transposed = transpose(board)
+    return (
+        table[board & ROW_MASK] + table[(board >> 16) & ROW_MASK]
+        + table[(board >> 32) & ROW_MASK] + table[(board >> 48) & ROW_MASK]
+        + table[transposed & ROW_MASK] + table[(transposed >> 16) & ROW_MASK]
+        + table[(transposed >> 32) & ROW_MASK] + table[(transposed >> 48) & ROW_MASK]
+    )
+
+
+class TranspositionTable:
+    """
+    Bounded LRU cache of evaluated positions.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._items[key] = value
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _Timeout(Exception):
+    pass
+
+
+class ExpectimaxPlayer:
+    """
+    Picks moves by expectimax search over the tile spawn chance nodes.
+    :param depth: max search depth in player moves
+    :param time_budget: seconds per move, the deepest finished iteration is used (None - no limit)
+    :param cache_size: max transposition table entries
+    """
+
+    def __init__(self, depth: int = 3, time_budget: float = 0.05, cache_size: int = 100000):
+        self.depth = depth
+        self.time_budget = time_budget
+        self.cache = TranspositionTable(cache_size)
+        self.moves = 0
+        self.search_time = 0.0
+        self._deadline = None
+
+    def choose(self, board: int) -> Direction | None:
+        """
+        :return: best direction or None if there are no moves
+        """
+        start_time = time.perf_counter()
+        self._deadline = start_time + self.time_budget if self.time_budget else None
+        best_direction = None
+        for depth in range(1, self.depth + 1):
+            try:
+                best_direction = self._search_root(board, depth) or best_direction
+            except _Timeout:
+                break
+
+        self.moves += 1
+        self.search_time += time.perf_counter() - start_time
+        return best_direction
+
+    def choose_for_array(self, array: list[list[int]]) -> Direction | None:
+        return self.choose(bitboard.from_array(array))
+
+    def stats(self) -> dict:
+        return dict(
+            moves=self.moves,
+            moves_per_sec=self.moves / self.search_time if self.search_time else 0.0,
+            cache_hit_rate=self.cache.hit_rate,
+            cache_size=len(self.cache),
+        )
+
+    def _search_root(self, board: int, depth: int) -> Direction | None:
+        best_direction = None
+        best_value = -1.0
+        for direction in Direction:
+            new_board, _, changed = move(board, direction)
+            if not changed:
+                continue
+            value = self._chance_node(new_board, depth - 1, 1.0)
+            if value > best_value:
+                best_value = value
+                best_direction = direction
+        return best_direction
+
+    def _max_node(self, board: int, depth: int, probability: float) -> float:
+        best_value = 0.0
+        for direction in Direction:
+            new_board, _, changed = move(board, direction)
+            if changed:
+                best_value = max(best_value, self._chance_node(new_board, depth - 1, probability))
+        return best_value
+
+    def _chance_node(self, board: int, depth: int, probability: float) -> float:
+        if depth <= 0 or probability < MIN_PROBABILITY:
+            return heuristic(board)
+
+        key = (board, depth)
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+
+        if self._deadline and time.perf_counter() > self._deadline:
+            raise _Timeout()
+
+        empty_cells = get_empty_cells(board)
+        probability /= len(empty_cells)
+        value = 0.0
+        for index in empty_cells:
+            shift = 4 * index
+            value += 0.75 * self._max_node(board | (1 << shift), depth, probability * 0.75)
+            value += 0.25 * self._max_node(board | (2 << shift), depth, probability * 0.25)
+        value /= len(empty_cells)
+
+        self.cache.put(key, value)
+        return value
+
+
+def play(engine: Engine2048, player: ExpectimaxPlayer, max_moves: int = None) -> int:
+    """
+    Plays the headless engine until game over.
+    :return: number of moves made
+    """
+    moves = 0
+    while not engine.game_over and (max_moves is None or moves < max_moves):
+        direction = player.choose_for_array(engine.board)
+        if direction is None:
+            engine.game_over = True
+            break
+        engine.move(direction)
+        moves += 1
+    return moves
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='2048 expectimax autoplayer')
+    parser.add_argument('--games', type=int, default=1)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--time', type=float, default=0.05, help='time budget per move in seconds')
+    parser.add_argument('--cache', type=int, default=100000, help='transposition table size')
+    args = parser.parse_args()
+
+    player = ExpectimaxPlayer(args.depth, args.time, args.cache)
+    for game_index in range(args.games):
+        engine = Engine2048()
+        engine.add_random_tile()
+        moves = play(engine, player)
+        print(f'Game {game_index + 1}: max tile: {engine.max_tile()} score: {engine.score} moves: {moves}')
+
+    stats = player.stats()
+    print(f'Moves/sec: {stats["moves_per_sec"]:.1f} cache hit rate: {stats["cache_hit_rate"]:.1%} '
+          f'cache size: {stats["cache_size"]}')
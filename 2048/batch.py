@@ -0,0 +1,137 @@
+"""
+Vectorized 2048: steps N boards of any size at once on an (N, size, size) array of tile values.
+"""
+import numpy as np
+
+from logic import Direction
+
+# Direction codes used in the directions arrays
+DIRECTIONS = (Direction.up, Direction.down, Direction.left, Direction.right)
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+
+def _to_left(boards: np.ndarray, direction: Direction) -> np.ndarray:
+    """
+    Orients boards so that moving in the direction becomes moving left.
+    """
+    if direction is Direction.up:
+        return boards.transpose(0, 2, 1)
+    if direction is Direction.down:
+        return boards.transpose(0, 2, 1)[:, :, ::-1]
+    if direction is Direction.right:
+        return boards[:, :, ::-1]
+    return boards
+
+
+def _from_left(boards: np.ndarray, direction: Direction) -> np.ndarray:
+    if direction is Direction.down:
+        return boards[:, :, ::-1].transpose(0, 2, 1)
+    return _to_left(boards, direction)
+
+
+def _compress(lines: np.ndarray) -> np.ndarray:
+    """
+    Shifts non-zero values of every line to its beginning keeping their order.
+    """
+    count, size, _ = lines.shape
+    non_zero = lines != 0
+    targets = np.cumsum(non_zero, axis=-1) - 1
+    targets += np.arange(0, count * size * size, size).reshape(count, size, 1)
+    result = np.zeros_like(lines)
+    result.reshape(-1)[targets[non_zero]] = lines[non_zero]
+    return result
+
+
+def _move_left(lines: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    lines = _compress(lines)
+    score_gain = np.zeros(len(lines), dtype=lines.dtype)
+    # The loop goes over the columns, all the boards are processed at once
+    for index in range(lines.shape[-1] - 1):
+        left = lines[..., index]
+        right = lines[..., index + 1]
+        merge = (left == right) & (left != 0)
+        merged = np.where(merge, left * 2, left)
+        lines[..., index] = merged
+        lines[..., index + 1] = np.where(merge, 0, right)
+        score_gain += np.where(merge, merged, 0).sum(axis=1)
+    return _compress(lines), score_gain
+
+
+def move_boards(boards: np.ndarray, directions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Batch version of logic.move: one direction code per board.
+    :return: new boards, score gains and changed mask
+    """
+    new_boards = np.empty_like(boards)
+    score_gain = np.zeros(len(boards), dtype=boards.dtype)
+    for code, direction in enumerate(DIRECTIONS):
+        mask = directions == code
+        if not mask.any():
+            continue
+        lines, gain = _move_left(np.ascontiguousarray(_to_left(boards[mask], direction)))
+        new_boards[mask] = _from_left(lines, direction)
+        score_gain[mask] = gain
+
+    changed = (new_boards != boards).any(axis=(1, 2))
+    return new_boards, score_gain, changed
+
+
+def can_move(boards: np.ndarray) -> np.ndarray:
+    has_empty = (boards == 0).any(axis=(1, 2))
+    horizontal = (boards[:, :, 1:] == boards[:, :, :-1]).any(axis=(1, 2))
+    vertical = (boards[:, 1:, :] == boards[:, :-1, :]).any(axis=(1, 2))
+    return has_empty | horizontal | vertical
+
+
+def add_random_tiles(boards: np.ndarray, mask: np.ndarray, rng: np.random.Generator):
+    """
+    Puts 2 or 4 into a random empty cell of every masked board (in place).
+    Boards without empty cells are skipped.
+    """
+    count, size, _ = boards.shape
+    flat = boards.reshape(count, size * size)
+    empty = flat == 0
+    mask = mask & empty.any(axis=1)
+    # Random weights on the empty cells only, the biggest one is the chosen cell
+    weights = np.where(empty, rng.random(flat.shape), -1.0)
+    cells = weights.argmax(axis=1)
+    values = np.where(rng.random(count) <= 0.75, 2, 4)
+    rows = np.flatnonzero(mask)
+    flat[rows, cells[rows]] = values[rows]
+
+
+class BatchGame2048:
+
+    def __init__(self, count: int, size: int = 4, seed: int = None):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.zeros((count, size, size), dtype=np.int64)
+        self.scores = np.zeros(count, dtype=np.int64)
+        self.moves = np.zeros(count, dtype=np.int64)
+        self.game_over = np.zeros(count, dtype=bool)
+        self.reset()
+
+    def reset(self, mask: np.ndarray = None):
+        if mask is None:
+            mask = np.ones(len(self.boards), dtype=bool)
+        self.boards[mask] = 0
+        self.scores[mask] = 0
+        self.moves[mask] = 0
+        self.game_over[mask] = False
+        add_random_tiles(self.boards, mask, self.rng)
+
+    def step(self, directions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Applies one direction code per board, boards with game over are not changed.
+        :return: score gains and game over mask
+        """
+        new_boards, score_gain, changed = move_boards(self.boards, directions)
+        changed &= ~self.game_over
+        score_gain[~changed] = 0
+
+        self.boards[changed] = new_boards[changed]
+        add_random_tiles(self.boards, changed, self.rng)
+        self.scores += score_gain
+        self.moves += changed
+        self.game_over |= ~can_move(self.boards)
+        return score_gain, self.game_over.copy()
@@ -0,0 +1,50 @@
+import argparse
+import random
+import time
+
+from batch import BatchGame2048
+from logic import Direction, create_board, move
+
+
+def bench_batch(boards: int, steps: int, size: int) -> float:
+    """
+    :return: boards * moves per second of BatchGame2048
+    """
+    game = BatchGame2048(boards, size, seed=0)
+    directions = game.rng.integers(0, 4, (steps, boards))
+    start_time = time.perf_counter()
+    for step in range(steps):
+        _, game_over = game.step(directions[step])
+        if game_over.any():
+            game.reset(game_over)
+    return boards * steps / (time.perf_counter() - start_time)
+
+
+def bench_move_array(moves: int, size: int) -> float:
+    """
+    :return: moves per second of the list based logic.move (used by Game2048._move_array)
+    """
+    rng = random.Random(0)
+    values = [0, 0, 2, 4, 8, 16]
+    board = create_board(size)
+    directions = list(Direction)
+    start_time = time.perf_counter()
+    for index in range(moves):
+        if index % 100 == 0:
+            board = [[rng.choice(values) for _ in range(size)] for _ in range(size)]
+        board, _, _ = move(board, directions[index % 4])
+    return moves / (time.perf_counter() - start_time)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='2048 batch simulator throughput')
+    parser.add_argument('--boards', type=int, default=10000)
+    parser.add_argument('--steps', type=int, default=100)
+    parser.add_argument('--size', type=int, default=4)
+    args = parser.parse_args()
+
+    batch_speed = bench_batch(args.boards, args.steps, args.size)
+    list_speed = bench_move_array(args.boards * args.steps // 10, args.size)
+    print(f'BatchGame2048: {batch_speed:,.0f} boards*moves/sec')
+    print(f'_move_array:   {list_speed:,.0f} moves/sec')
+    print(f'Speedup:       {batch_speed / list_speed:.1f}x')
@@ -0,0 +1,151 @@
+"""
+Packed 4x4 board: 64-bit int with 4 bits per cell storing the tile exponent (0 - empty, 1 - 2, 2 - 4, ...).
+Cell (row, cell) is stored in the nibble 4 * row + cell, row 0 takes the lowest 16 bits.
+Moves are done with 65536-entry lookup tables over 16-bit rows.
+"""
+import random
+
+from logic import Direction
+
+SIZE = 4
+MAX_EXPONENT = 0xF
+ROW_MASK = 0xFFFF
+COL_MASK = 0x000F_000F_000F_000F
+
+
+def _reverse_row(row: int) -> int:
+    return (row >> 12) | ((row >> 4) & 0x00F0) | ((row << 4) & 0x0F00) | ((row << 12) & 0xF000)
+
+
+def _unpack_col(row: int) -> int:
+    return (row | (row << 12) | (row << 24) | (row << 36)) & COL_MASK
+
+
+def _build_tables():
+    row_left = [0] * 65536
+    row_score = [0] * 65536
+    for row in range(65536):
+        values = [(row >> (4 * index)) & 0xF for index in range(SIZE)]
+        values = [value for value in values if value]
+        merged = []
+        score = 0
+        index = 0
+        while index < len(values):
+            value = values[index]
+            if index + 1 < len(values) and values[index + 1] == value and value < MAX_EXPONENT:
+                value += 1
+                score += 1 << value
+                index += 2
+            else:
+                index += 1
+            merged.append(value)
+
+        result = 0
+        for index, value in enumerate(merged):
+            result |= value << (4 * index)
+        row_left[row] = result
+        row_score[row] = score
+
+    row_right = [_reverse_row(row_left[_reverse_row(row)]) for row in range(65536)]
+    col_up = [_unpack_col(row) for row in row_left]
+    col_down = [_unpack_col(row) for row in row_right]
+    return row_left, row_right, col_up, col_down, row_score
+
+
+ROW_LEFT, ROW_RIGHT, COL_UP, COL_DOWN, ROW_SCORE = _build_tables()
+
+
+def transpose(board: int) -> int:
+    a1 = board & 0xF0F0_0F0F_F0F0_0F0F
+    a2 = board & 0x0000_F0F0_0000_F0F0
+    a3 = board & 0x0F0F_0000_0F0F_0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00_FF00_00FF_00FF
+    b2 = a & 0x00FF_00FF_0000_0000
+    b3 = a & 0x0000_0000_FF00_FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def move(board: int, direction: Direction) -> tuple[int, int, bool]:
+    """
+    Same contract as logic.move but for a packed board.
+    :return: new board, score gain and whether the board was changed
+    """
+    if direction is Direction.left or direction is Direction.right:
+        table = ROW_LEFT if direction is Direction.left else ROW_RIGHT
+        r0 = board & ROW_MASK
+        r1 = (board >> 16) & ROW_MASK
+        r2 = (board >> 32) & ROW_MASK
+        r3 = (board >> 48) & ROW_MASK
+        new_board = table[r0] | (table[r1] << 16) | (table[r2] << 32) | (table[r3] << 48)
+    else:
+        table = COL_UP if direction is Direction.up else COL_DOWN
+        transposed = transpose(board)
+        r0 = transposed & ROW_MASK
+        r1 = (transposed >> 16) & ROW_MASK
+        r2 = (transposed >> 32) & ROW_MASK
+        r3 = (transposed >> 48) & ROW_MASK
+        new_board = table[r0] | (table[r1] << 4) | (table[r2] << 8) | (table[r3] << 12)
+
+    if new_board == board:
+        return board, 0, False
+    return new_board, ROW_SCORE[r0] + ROW_SCORE[r1] + ROW_SCORE[r2] + ROW_SCORE[r3], True
+
+
+def get_empty_cells(board: int) -> list[int]:
+    """
+    :return: nibble indexes of the empty cells
+    """
+    return [index for index in range(SIZE * SIZE) if not (board >> (4 * index)) & 0xF]
+
+
+def count_empty(board: int) -> int:
+    # Folds every nibble into its lowest bit: 1 - non-empty, 0 - empty
+    board |= board >> 2
+    board |= board >> 1
+    board = ~board & 0x1111_1111_1111_1111
+    return bin(board).count('1')
+
+
+def add_random_tile(board: int, rng: random.Random = random) -> int:
+    index = rng.choice(get_empty_cells(board))
+    exponent = 1 if rng.random() <= 0.75 else 2
+    return board | (exponent << (4 * index))
+
+
+def can_move(board: int) -> bool:
+    return any(move(board, direction)[2] for direction in Direction)
+
+
+def max_tile(board: int) -> int:
+    exponent = max((board >> (4 * index)) & 0xF for index in range(SIZE * SIZE))
+    return 1 << exponent if exponent else 0
+
+
+def from_array(array: list[list[int]]) -> int:
+    """
+    Packs an array in the Game2048._array / store.json format.
+    """
+    if len(array) != SIZE or any(len(row) != SIZE for row in array):
+        raise ValueError(f'Only {SIZE}x{SIZE} boards can be packed')
+
+    board = 0
+    for row_index, row in enumerate(array):
+        for cell_index, value in enumerate(row):
+            if value:
+                exponent = value.bit_length() - 1
+                if value != 1 << exponent or not 0 < exponent <= MAX_EXPONENT:
+                    raise ValueError(f'Value {value} can not be packed')
+                board |= exponent << (4 * (SIZE * row_index + cell_index))
+    return board
+
+
+def to_array(board: int) -> list[list[int]]:
+    array = []
+    for row_index in range(SIZE):
+        row = []
+        for cell_index in range(SIZE):
+            exponent = (board >> (4 * (SIZE * row_index + cell_index))) & 0xF
+            row.append(1 << exponent if exponent else 0)
+        array.append(row)
+    return array
@@ -0,0 +1,162 @@
+import random
+from enum import Enum
+from functools import lru_cache
+
+
+class Direction(Enum):
+    up = 'U'
+    down = 'D'
+    left = 'L'
+    right = 'R'
+
+
+@lru_cache(maxsize=1 << 16)
+def _merge_line(line: tuple) -> tuple[tuple, int]:
+    """
+    Shifts a line to its beginning merging equal neighbours (each tile merges at most once).
+    :return: new line and sum of merged values
+    """
+    values = [value for value in line if value]
+    merged = []
+    score_gain = 0
+    index = 0
+    while index < len(values):
+        value = values[index]
+        if index + 1 < len(values) and values[index + 1] == value:
+            value *= 2
+            score_gain += value
+            index += 2
+        else:
+            index += 1
+        merged.append(value)
+
+    merged.extend([0] * (len(line) - len(merged)))
+    return tuple(merged), score_gain
+
+
+def move(board: list[list[int]], direction: Direction) -> tuple[list[list[int]], int, bool]:
+    """
+    Moves the board in one of the directions without mutating it.
+    :return: new board, score gain and whether the board was changed
+    """
+    if direction is Direction.left:
+        lines = board
+    elif direction is Direction.right:
+        lines = [row[::-1] for row in board]
+    elif direction is Direction.up:
+        lines = list(zip(*board))
+    else:
+        lines = [column[::-1] for column in zip(*board)]
+
+    moved_lines = []
+    score_gain = 0
+    changed = False
+    for line in lines:
+        line = tuple(line)
+        moved_line, line_gain = _merge_line(line)
+        moved_lines.append(moved_line)
+        score_gain += line_gain
+        if moved_line != line:
+            changed = True
+
+    if direction is Direction.left:
+        new_board = [list(line) for line in moved_lines]
+    elif direction is Direction.right:
+        new_board = [list(line[::-1]) for line in moved_lines]
+    elif direction is Direction.up:
+        new_board = [list(row) for row in zip(*moved_lines)]
+    else:
+        new_board = [list(row) for row in zip(*[line[::-1] for line in moved_lines])]
+
+    return new_board, score_gain, changed
+
+
+def create_board(size: int) -> list[list[int]]:
+    return [[0] * size for _ in range(size)]
+
+
+def get_empty_cells(board: list[list[int]]) -> list[tuple[int, int]]:
+    return [
+        (row_index, cell_index)
+        for row_index, row in enumerate(board)
+        for cell_index, cell in enumerate(row)
+        if cell == 0
+    ]
+
+
+def is_zero_in_board(board: list[list[int]]) -> bool:
+    return any(0 in row for row in board)
+
+
+def can_move(board: list[list[int]]) -> bool:
+    if is_zero_in_board(board):
+        return True
+
+    size = len(board)
+    for row_index in range(size):
+        for cell_index in range(size):
+            value = board[row_index][cell_index]
+            if cell_index + 1 < size and board[row_index][cell_index + 1] == value:
+                return True
+            if row_index + 1 < size and board[row_index + 1][cell_index] == value:
+                return True
+    return False
+
+
+def max_tile(board: list[list[int]]) -> int:
+    return max(max(row) for row in board)
+
+
+class Engine2048:
+    """
+    Headless 2048 rules: board, score and tile spawning without any GUI.
+    """
+
+    def __init__(self, size: int = 4, board: list[list[int]] = None):
+        self.size = size
+        self.board = None
+        self.score = 0
+        self.game_over = False
+        self.reset(board)
+
+    def reset(self, board: list[list[int]] = None):
+        if board:
+            self.size = len(board)
+            self.board = board
+        else:
+            self.board = create_board(self.size)
+        self.score = 0
+        self.game_over = False
+
+    def slide(self, direction: Direction) -> bool:
+        """
+        Moves the board without adding a new tile.
+        :return: whether the board was changed
+        """
+        if self.game_over:
+            return False
+
+        new_board, score_gain, changed = move(self.board, direction)
+        if changed:
+            self.board = new_board
+            self.score += score_gain
+        return changed
+
+    def move(self, direction: Direction) -> bool:
+        changed = self.slide(direction)
+        if changed:
+            self.add_random_tile()
+        return changed
+
+    def add_random_tile(self) -> tuple[tuple[int, int], int]:
+        cell = random.choice(self.get_empty_cells())
+        value = 2 if random.random() <= 0.75 else 4
+        self.board[cell[0]][cell[1]] = value
+        self.game_over = not can_move(self.board)
+        return cell, value
+
+    def get_empty_cells(self) -> list[tuple[int, int]]:
+        return get_empty_cells(self.board)
+
+    def max_tile(self) -> int:
+        return max_tile(self.board)
@@ -1,17 +1,18 @@
+import argparse
 import json
 import pathlib
-import random
 import sys
 
 import pygame
 from pygame.font import Font
 from pygame.surface import Surface
 
+from logic import Direction, Engine2048, is_zero_in_board
+
 FPS = 60
 BLOCK_SIZE = 110
 BLOCK_MARGIN = 10
 TITLE_HEIGHT = 110
-ANIM_SLEEP_TIME = 25
 STORE_FILE = '2048/store.json'
 
 TITLE_COLOR = (243, 220, 202)
@@ -31,6 +32,13 @@ FIELD_COLORS[512] = dict(fg=(249, 246, 242), bg=(237, 200, 80))
 FIELD_COLORS[1024] = dict(fg=(249, 246, 242), bg=(237, 197, 63))
 FIELD_COLORS[2048] = dict(fg=(249, 246, 242), bg=(237, 194, 46))
 
+KEY_DIRECTIONS = {
+    pygame.K_UP: Direction.up,
+    pygame.K_DOWN: Direction.down,
+    pygame.K_LEFT: Direction.left,
+    pygame.K_RIGHT: Direction.right,
+}
+
 font_cache = dict()
 
 
@@ -51,6 +59,9 @@ class Game2048:
 
     def __init__(self):
         self._array_size = 4
+        self._engine = Engine2048(self._array_size)
+        self._score = 0
+        self._player = None
         # GUI
         pygame.display.set_caption('2048')
         pygame.init()
@@ -69,8 +80,13 @@ class Game2048:
         self._quit_button = self._create_button('[Q]uit')
         self._quit_button_rect = self._quit_button.get_rect(bottomright=self._menu_rect.bottomright).move(-20, -15)
 
-    def start(self, init_array=None):
+    def start(self, init_array=None, ai: bool = False, ai_depth: int = 3, ai_time_budget: float = 0.05):
+        """
+        :param ai: the game is played by ExpectimaxPlayer and restarted on game over, [A] toggles it
+        """
         self.init(init_array)
+        if ai:
+            self._enable_ai(ai_depth, ai_time_budget)
         while True:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -80,7 +96,12 @@ class Game2048:
                         self.quit()
                     elif event.key == pygame.K_r:
                         self.restart()
-                    elif event.key in [pygame.K_DOWN, pygame.K_UP, pygame.K_LEFT, pygame.K_RIGHT]:
+                    elif event.key == pygame.K_a:
+                        if self._player:
+                            self._player = None
+                        else:
+                            self._enable_ai(ai_depth, ai_time_budget)
+                    elif event.key in KEY_DIRECTIONS:
                         self._move_array(event.key)
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if self._restart_button_rect.collidepoint(event.pos):
@@ -88,6 +109,9 @@ class Game2048:
                     elif self._quit_button_rect.collidepoint(event.pos):
                         self.quit()
 
+            if self._player:
+                self._ai_move()
+
             self._draw_gui()
             self._clock.tick(FPS)
 
@@ -122,42 +146,50 @@ class Game2048:
         with open(STORE_FILE, 'w') as file:
             json.dump(state, file, indent=2)
 
+        if self._player:
+            self.print_ai_stats()
+
         # Quit
         pygame.quit()
         sys.exit(0)
 
+    def print_ai_stats(self):
+        stats = self._player.stats()
+        print(f'AI moves: {stats["moves"]} moves/sec: {stats["moves_per_sec"]:.1f} '
+              f'cache hit rate: {stats["cache_hit_rate"]:.1%} cache size: {stats["cache_size"]}')
+
     def print_array(self):
         print('-' * 15)
         for row in self._array:
             print(row)
         print()
 
+    @property
+    def _array(self) -> list[list[int]]:
+        return self._engine.board
+
+    @property
+    def _game_over(self) -> bool:
+        return self._engine.game_over
+
+    @_game_over.setter
+    def _game_over(self, value: bool):
+        self._engine.game_over = value
+
     def _reset(self, init_array=None):
-        self._game_over = False
+        self._engine.reset(init_array)
+        self._array_size = self._engine.size
         self._score = 0
-        self._init_array(init_array)
 
     def _init_array(self, init_array=None):
-        self._is_rotated_array = False
-        if init_array:
-            self._array = init_array
-            return
-
-        self._array = []
-        for row_index in range(self._array_size):
-            row = []
-            for cell_index in range(self._array_size):
-                row.append(0)
-            self._array.append(row)
+        game_over = self._game_over
+        self._reset(init_array)
+        self._game_over = game_over
 
     def _game_action(self, add_new_value: bool):
         if add_new_value:
-            empty_cells = self._get_empty_cells()
-            random.shuffle(empty_cells)
-            cell = empty_cells.pop()
-            value = self._add_2_or_4(cell)
+            cell, value = self._engine.add_random_tile()
             print(f'Filled: ({cell[0] + 1}, {cell[1] + 1}) value: {value}')
-            self._game_over = not self._is_zero_in_array()
 
         self._calc_score()
         self.print_array()
@@ -165,55 +197,36 @@ class Game2048:
     def _move_array(self, key: int):
         """
         Сдвигает элементы поля в одно из направлений.
-        Если поле сдвигается влево или вправо, то массив поворачивается по часовой стрелке на 90 градусов.
-        Столбцы становятся строками и работает алгоритм для сдвига вверх и вниз.
+        Логика сдвига находится в Engine2048, здесь только добавляется новое значение и считается счет.
         :param key: клавиша вверх, вниз, влево или вправо
         """
         if self._game_over:
             return
 
-        if key in [pygame.K_LEFT, pygame.K_RIGHT]:
-            self._rotate_array()
-
-        merged_cells = []
-        array_was_changed = False
-        for current_row_index in range(self._array_size - 1):
-            for row_index in reversed(range(current_row_index + 1)):
-                for cell_index in range(self._array_size):
-                    if key in [pygame.K_DOWN, pygame.K_RIGHT]:
-                        y_pos = self._array_size - row_index - 2
-                        y_another_pos = y_pos + 1
-                        x_pos = cell_index
-                    elif key in [pygame.K_UP, pygame.K_LEFT]:
-                        y_pos = row_index + 1
-                        y_another_pos = y_pos - 1
-                        x_pos = cell_index
-                    else:
-                        break
-
-                    current_value = self._array[y_pos][x_pos]
-                    another_value = self._array[y_another_pos][x_pos]
-
-                    # Shifting and summing
-                    if current_value != 0 and another_value == 0:
-                        self._array[y_another_pos][x_pos] = self._array[y_pos][x_pos]
-                        self._array[y_pos][x_pos] = 0
-                        array_was_changed = True
-                    elif x_pos not in merged_cells and current_value != 0 and current_value == another_value:
-                        self._array[y_another_pos][x_pos] *= 2
-                        self._array[y_pos][x_pos] = 0
-                        merged_cells.append(x_pos)
-                        array_was_changed = True
-
-                if array_was_changed:
-                    self._draw_gui()
-                    pygame.time.wait(ANIM_SLEEP_TIME)
-
-        if self._is_rotated_array:
-            self._rotate_array()
+        self._move(KEY_DIRECTIONS[key])
 
+    def _move(self, direction: Direction):
+        array_was_changed = self._engine.slide(direction)
         self._game_action(array_was_changed)
 
+    def _enable_ai(self, depth: int, time_budget: float):
+        # Tables of the AI take noticeable time to build so it is imported only when needed
+        from ai import ExpectimaxPlayer
+
+        self._player = ExpectimaxPlayer(depth, time_budget)
+
+    def _ai_move(self):
+        if self._game_over:
+            self.print_ai_stats()
+            self.restart()
+            return
+
+        direction = self._player.choose_for_array(self._array)
+        if direction is None:
+            self._game_over = True
+        else:
+            self._move(direction)
+
     def _draw_gui(self):
         self._screen.fill(TITLE_COLOR)
 
@@ -280,11 +293,6 @@ class Game2048:
         return surface
 
     def _draw_field(self):
-        array_was_rotated = False
-        if self._is_rotated_array:
-            self._rotate_array()
-            array_was_rotated = True
-
         self._field.fill(FIELD_COLOR)
         for row_index in range(self._array_size):
             for cell_index in range(self._array_size):
@@ -310,9 +318,6 @@ class Game2048:
 
         self._screen.blit(self._field, self._field_rect)
 
-        if array_was_rotated:
-            self._rotate_array()
-
     @staticmethod
     def _get_value_font_size(value: int):
         if value >= 100000:
@@ -330,48 +335,18 @@ class Game2048:
         self._best_score = max(self._best_score, self._score)
 
     def _is_zero_in_array(self):
-        for row in self._array:
-            for cell in row:
-                if cell == 0:
-                    return True
-        return False
+        return is_zero_in_board(self._array)
 
     def _get_empty_cells(self):
-        empty_cells = []
-        for row_index in range(self._array_size):
-            for cell_index in range(self._array_size):
-                if self._array[row_index][cell_index] == 0:
-                    empty_cells.append((row_index, cell_index))
-        return empty_cells
-
-    def _add_2_or_4(self, cell: tuple[int, int]):
-        x, y = cell
-        self._array[x][y] = 2 if random.random() <= 0.75 else 4
-        return self._array[x][y]
-
-    def _rotate_array(self):
-        """
-        Если массив не был повернут то поворачивает его по часовой стрелке на 90 градусов.
-        Иначе поворачивает его в исходное состояние.
-        self._is_rotated_array - хранит состояние поворота массива
-        """
-        rotated_array = []
-
-        for cell_index in range(self._array_size):
-            row = []
-            for row_index in range(self._array_size):
-                row.append(self._array[row_index][cell_index])
-            if not self._is_rotated_array:
-                row.reverse()
-            rotated_array.append(row)
-
-        if self._is_rotated_array:
-            rotated_array.reverse()
-
-        self._array = rotated_array
-        self._is_rotated_array = not self._is_rotated_array
+        return self._engine.get_empty_cells()
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='2048 game')
+    parser.add_argument('--ai', action='store_true', help='autoplay by the expectimax AI')
+    parser.add_argument('--ai-depth', type=int, default=3)
+    parser.add_argument('--ai-time', type=float, default=0.05, help='AI time budget per move in seconds')
+    args = parser.parse_args()
+
     game = Game2048()
-    game.start()
+    game.start(ai=args.ai, ai_depth=args.ai_depth, ai_time_budget=args.ai_time)
@@ -0,0 +1,147 @@
+"""
+Runs many independent 2048 games in a process pool and aggregates their statistics.
+Every game has its own RNG seeded from (seed, game index), so the result does not depend on the number of workers.
+
+    python simulate.py --games 100000 --workers 8 --seed 1
+"""
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+
+from bitboard import add_random_tile, max_tile, move
+from logic import Direction
+
+DIRECTIONS = list(Direction)
+
+
+@dataclass
+class SimulationStats:
+    games: int = 0
+    moves: int = 0
+    score: int = 0
+    min_moves: int = None
+    max_moves: int = 0
+    busy_time: float = 0.0
+    max_tiles: Counter = field(default_factory=Counter)
+
+    def add_game(self, moves: int, score: int, tile: int):
+        self.games += 1
+        self.moves += moves
+        self.score += score
+        self.min_moves = moves if self.min_moves is None else min(self.min_moves, moves)
+        self.max_moves = max(self.max_moves, moves)
+        self.max_tiles[tile] += 1
+
+    def merge(self, other: 'SimulationStats'):
+        self.games += other.games
+        self.moves += other.moves
+        self.score += other.score
+        if other.min_moves is not None:
+            self.min_moves = other.min_moves if self.min_moves is None else min(self.min_moves, other.min_moves)
+        self.max_moves = max(self.max_moves, other.max_moves)
+        self.busy_time += other.busy_time
+        self.max_tiles.update(other.max_tiles)
+
+
+def game_rng(seed: int, game_index: int) -> random.Random:
+    return random.Random((seed << 32) | game_index)
+
+
+def play_game(rng: random.Random, player=None) -> tuple[int, int, int]:
+    """
+    Plays one game on a packed board with random moves or by the player.
+    :return: moves, score and max tile
+    """
+    board = add_random_tile(0, rng)
+    moves = 0
+    score = 0
+    while True:
+        if player:
+            direction = player.choose(board)
+            if direction is None:
+                break
+            board, score_gain, _ = move(board, direction)
+        else:
+            directions = rng.sample(DIRECTIONS, len(DIRECTIONS))
+            for direction in directions:
+                new_board, score_gain, changed = move(board, direction)
+                if changed:
+                    board = new_board
+                    break
+            else:
+                break
+
+        board = add_random_tile(board, rng)
+        moves += 1
+        score += score_gain
+    return moves, score, max_tile(board)
+
+
+def run_shard(seed: int, first_game: int, games: int, ai_depth: int = None) -> SimulationStats:
+    player = None
+    if ai_depth:
+        from ai import ExpectimaxPlayer
+
+        # No time budget, otherwise the moves would depend on the machine load
+        player = ExpectimaxPlayer(ai_depth, time_budget=None)
+
+    stats = SimulationStats()
+    start_time = time.perf_counter()
+    for game_index in range(first_game, first_game + games):
+        stats.add_game(*play_game(game_rng(seed, game_index), player))
+    stats.busy_time = time.perf_counter() - start_time
+    return stats
+
+
+def _run_shard(args: tuple) -> SimulationStats:
+    return run_shard(*args)
+
+
+def simulate(games: int, workers: int, seed: int, shard_size: int = 1000, ai_depth: int = None,
+             on_progress=None) -> SimulationStats:
+    """
+    :param on_progress: called with the aggregated stats after every finished shard
+    """
+    shards = [
+        (seed, first_game, min(shard_size, games - first_game), ai_depth)
+        for first_game in range(0, games, shard_size)
+    ]
+    total = SimulationStats()
+    with Pool(workers) as pool:
+        for stats in pool.imap_unordered(_run_shard, shards):
+            total.merge(stats)
+            if on_progress:
+                on_progress(total)
+    return total
+
+
+def print_stats(stats: SimulationStats, wall_time: float, workers: int):
+    print(f'Games: {stats.games} workers: {workers} wall time: {wall_time:.2f}s')
+    print(f'Games/sec: {stats.games / wall_time:,.0f} per core: {stats.games / stats.busy_time:,.0f}')
+    print(f'Moves per game: avg {stats.moves / stats.games:.1f} min {stats.min_moves} max {stats.max_moves}')
+    print(f'Avg score: {stats.score / stats.games:.1f}')
+    print('Max tile distribution:')
+    for tile, count in sorted(stats.max_tiles.items()):
+        print(f'  {tile:>6}: {count:>8} ({count / stats.games:.2%})')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parallel 2048 simulation')
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shard-size', type=int, default=1000, help='games per task sent to a worker')
+    parser.add_argument('--ai-depth', type=int, help='play by the expectimax AI instead of random moves')
+    args = parser.parse_args()
+
+    def on_progress(stats: SimulationStats):
+        print(f'\r{stats.games}/{args.games} games', end='', flush=True)
+
+    start_time = time.perf_counter()
+    result = simulate(args.games, args.workers, args.seed, args.shard_size, args.ai_depth, on_progress)
+    print()
+    print_stats(result, time.perf_counter() - start_time, args.workers)
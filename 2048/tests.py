@@ -1,5 +1,12 @@
 from unittest import TestCase
 
+import numpy as np
+
+import bitboard
+from ai import ExpectimaxPlayer, TranspositionTable, play
+from batch import DIRECTION_CODES, BatchGame2048, move_boards
+from simulate import run_shard, simulate
+from logic import Direction, Engine2048, can_move, move
 from main import Game2048
 
 
@@ -36,3 +43,175 @@ class Test2048(TestCase):
             [16, 256, 10000, 0],
         ]
         self.game.start(init_array)
+
+
+class TestLogic(TestCase):
+
+    def test_move(self):
+        board = [
+            [2, 2, 2, 2],
+            [4, 0, 4, 8],
+            [0, 0, 0, 2],
+            [2, 0, 0, 2],
+        ]
+        new_board, score_gain, changed = move(board, Direction.left)
+        self.assertEqual(new_board, [
+            [4, 4, 0, 0],
+            [8, 8, 0, 0],
+            [2, 0, 0, 0],
+            [4, 0, 0, 0],
+        ])
+        self.assertEqual(score_gain, 4 + 4 + 8 + 4)
+        self.assertTrue(changed)
+        self.assertEqual(board[0], [2, 2, 2, 2])
+
+        new_board, score_gain, changed = move(board, Direction.down)
+        self.assertEqual(new_board, [
+            [0, 0, 0, 0],
+            [2, 0, 0, 2],
+            [4, 0, 2, 8],
+            [2, 2, 4, 4],
+        ])
+        self.assertEqual(score_gain, 4)
+        self.assertTrue(changed)
+
+    def test_move_unchanged(self):
+        board = [
+            [2, 4],
+            [0, 0],
+        ]
+        new_board, score_gain, changed = move(board, Direction.up)
+        self.assertEqual(new_board, board)
+        self.assertEqual(score_gain, 0)
+        self.assertFalse(changed)
+
+    def test_can_move(self):
+        self.assertFalse(can_move([[2, 4], [4, 2]]))
+        self.assertTrue(can_move([[2, 2], [4, 8]]))
+        self.assertTrue(can_move([[2, 4], [2, 8]]))
+
+    def test_engine_move(self):
+        engine = Engine2048(board=[[2, 2], [0, 0]])
+        self.assertTrue(engine.move(Direction.right))
+        self.assertEqual(engine.score, 4)
+        self.assertEqual(engine.board[0][1], 4)
+        self.assertEqual(len(engine.get_empty_cells()), 2)
+
+
+class TestBitboard(TestCase):
+
+    def test_array_conversion(self):
+        array = [
+            [2, 32, 512, 0],
+            [4, 64, 1024, 0],
+            [8, 128, 2048, 0],
+            [16, 256, 32768, 0],
+        ]
+        board = bitboard.from_array(array)
+        self.assertEqual(bitboard.to_array(board), array)
+        self.assertEqual(bitboard.count_empty(board), 4)
+        self.assertEqual(bitboard.max_tile(board), 32768)
+        self.assertRaises(ValueError, bitboard.from_array, [[100000] * 4] * 4)
+        self.assertRaises(ValueError, bitboard.from_array, [[0] * 5] * 5)
+
+    def test_transpose(self):
+        array = [[(row * 4 + cell) % 8 and 2 ** ((row * 4 + cell) % 8) for cell in range(4)] for row in range(4)]
+        board = bitboard.from_array(array)
+        transposed = [list(row) for row in zip(*array)]
+        self.assertEqual(bitboard.transpose(board), bitboard.from_array(transposed))
+
+    def test_move_same_as_logic(self):
+        array = [
+            [2, 2, 2, 2],
+            [4, 0, 4, 8],
+            [0, 0, 0, 2],
+            [2, 0, 0, 2],
+        ]
+        board = bitboard.from_array(array)
+        for direction in Direction:
+            new_array, score_gain, changed = move(array, direction)
+            new_board, board_score_gain, board_changed = bitboard.move(board, direction)
+            self.assertEqual(bitboard.to_array(new_board), new_array)
+            self.assertEqual(board_score_gain, score_gain)
+            self.assertEqual(board_changed, changed)
+
+
+class TestBatch(TestCase):
+
+    def test_move_boards_same_as_logic(self):
+        rng = np.random.default_rng(0)
+        boards = rng.choice([0, 0, 2, 4, 8], (100, 5, 5))
+        directions = rng.integers(0, 4, 100)
+        new_boards, score_gains, changed = move_boards(boards, directions)
+        codes = {code: direction for direction, code in DIRECTION_CODES.items()}
+        for index in range(len(boards)):
+            new_board, score_gain, board_changed = move(boards[index].tolist(), codes[directions[index]])
+            self.assertEqual(new_boards[index].tolist(), new_board)
+            self.assertEqual(score_gains[index], score_gain)
+            self.assertEqual(changed[index], board_changed)
+
+    def test_step(self):
+        game = BatchGame2048(50, size=3, seed=0)
+        self.assertTrue(((game.boards != 0).sum(axis=(1, 2)) == 1).all())
+        for _ in range(500):
+            _, game_over = game.step(game.rng.integers(0, 4, 50))
+        self.assertTrue(game_over.all())
+        self.assertTrue(np.isin(game.boards, [0, 2, 4, 8, 16, 32, 64, 128, 256, 512]).all())
+
+
+class TestAI(TestCase):
+
+    def test_transposition_table(self):
+        cache = TranspositionTable(2)
+        cache.put(1, 1.0)
+        cache.put(2, 2.0)
+        self.assertEqual(cache.get(1), 1.0)
+        cache.put(3, 3.0)
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(3), 3.0)
+        self.assertEqual(len(cache), 2)
+        self.assertAlmostEqual(cache.hit_rate, 2 / 3)
+
+    def test_choose(self):
+        player = ExpectimaxPlayer(depth=2, time_budget=None)
+        board = bitboard.from_array([
+            [2, 4, 8, 16],
+            [4, 8, 16, 32],
+            [8, 16, 32, 64],
+            [16, 32, 64, 128],
+        ])
+        self.assertIsNone(player.choose(board))
+
+        board = bitboard.from_array([
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+            [2, 2, 0, 0],
+        ])
+        self.assertIn(player.choose(board), list(Direction))
+        self.assertEqual(player.stats()['moves'], 2)
+
+    def test_play(self):
+        engine = Engine2048()
+        engine.add_random_tile()
+        moves = play(engine, ExpectimaxPlayer(depth=1, time_budget=None), max_moves=50)
+        self.assertEqual(moves, 50)
+        self.assertGreaterEqual(engine.max_tile(), 16)
+
+
+class TestSimulate(TestCase):
+
+    def test_deterministic(self):
+        first = run_shard(seed=1, first_game=0, games=20)
+        second = run_shard(seed=1, first_game=0, games=20)
+        self.assertEqual(first.max_tiles, second.max_tiles)
+        self.assertEqual(first.moves, second.moves)
+        self.assertEqual(first.games, 20)
+
+    def test_simulate_does_not_depend_on_workers(self):
+        single = simulate(games=30, workers=1, seed=2, shard_size=10)
+        parallel = simulate(games=30, workers=2, seed=2, shard_size=7)
+        self.assertEqual(single.games, parallel.games)
+        self.assertEqual(single.max_tiles, parallel.max_tiles)
+        self.assertEqual(single.moves, parallel.moves)
+        self.assertEqual(single.score, parallel.score)